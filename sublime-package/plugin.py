@@ -5,54 +5,125 @@ This plugin provides Language Server Protocol support for Fleet GitOps
 configuration files, with automatic binary download from GitHub releases.
 """
 
+import base64
+import contextlib
+import gzip
+import http.client
 import os
 import platform
 import shutil
+import ssl
 import stat
 import subprocess
 import tarfile
+import threading
+import time
+import urllib.parse
 import urllib.request
 import json
+import hashlib
 from pathlib import Path
 
 import sublime
 
 # LSP imports
 from LSP.plugin import AbstractPlugin, ClientConfig, WorkspaceFolder
-from LSP.plugin.core.typing import Optional, List, Dict, Any
+from LSP.plugin.core.typing import Optional, List, Dict, Any, Tuple, Iterator
 
 BINARY_NAME = "fleet-schema-gen"
+# Name the binary is extracted under before it replaces BINARY_NAME
+PART_NAME = BINARY_NAME + ".part"
 GITHUB_REPO = "fleetdm/fleet"
 PACKAGE_NAME = "LSP-fleet"
+SETTINGS_NAME = "LSP-fleet.sublime-settings"
+
+# Stop querying the GitHub API once this many anonymous requests remain
+RATE_LIMIT_RESERVE = 1
+
+# Read size when hashing the downloaded binary
+HASH_CHUNK_SIZE = 1 << 20
+
+# Redirects followed per request (release assets redirect to a CDN host)
+MAX_REDIRECTS = 5
+
+# How long a fetched release is reused before GitHub is asked again
+RELEASE_INFO_TTL = 3600
+
+# Idle kept-alive HTTPS connections, keyed by host
+_HTTP_CONNECTIONS: Dict[str, http.client.HTTPSConnection] = {}
+_HTTP_LOCK = threading.Lock()
+
+# Epoch time until which the GitHub API should not be queried
+_RATE_LIMIT_RESET = 0.0
+
+# (time.monotonic() of the lookup, release) from get_latest_release_info
+_RELEASE_INFO_CACHE: Optional[Tuple[float, Optional[Dict[str, Any]]]] = None
+
+# Result of the last successful get_binary_path lookup
+_BINARY_PATH_CACHE: Optional[str] = None
+_BINARY_PATH_LOCK = threading.Lock()
+
+# Progress of the background download started by ensure_binary_async
+_INSTALL_STATE: Dict[str, Any] = {"started": False, "done": False, "path": None, "thread": None}
+
+# `fleet-schema-gen --version` output, keyed by binary path
+_SERVER_VERSION_CACHE: Dict[str, str] = {}
+
+# Package settings, loaded once in plugin_loaded
+_SETTINGS: Optional[sublime.Settings] = None
+
+# Package storage directory, created once by get_storage_path
+_STORAGE_PATH: Optional[Path] = None
+
+
+# Normalized platform.machine() values
+_ARCH_NORM = {
+    "arm64": "arm64",
+    "aarch64": "arm64",
+    "x86_64": "x64",
+    "amd64": "x64",
+}
+
+# Release asset suffix for each (platform.system(), normalized arch)
+_PLATFORM_SUFFIXES = {
+    ("darwin", "arm64"): "darwin-arm64",
+    ("darwin", "x64"): "darwin-x64",
+    ("linux", "x64"): "linux-x64",
+    ("linux", "arm64"): "linux-arm64",
+    ("windows", "x64"): "windows-x64",
+    # No native build; runs under Windows' x64 emulation
+    ("windows", "arm64"): "windows-x64",
+}
+
+_PLATFORM_SUFFIX = _PLATFORM_SUFFIXES.get(
+    (platform.system().lower(), _ARCH_NORM.get(platform.machine().lower(), ""))
+)
 
 
 def get_platform_suffix() -> Optional[str]:
     """Get the platform-specific suffix for the binary download."""
-    system = platform.system().lower()
-    machine = platform.machine().lower()
+    return _PLATFORM_SUFFIX
 
-    if system == "darwin":
-        if machine in ("arm64", "aarch64"):
-            return "darwin-arm64"
-        elif machine in ("x86_64", "amd64"):
-            return "darwin-x64"
-    elif system == "linux":
-        if machine in ("x86_64", "amd64"):
-            return "linux-x64"
-        elif machine in ("aarch64", "arm64"):
-            return "linux-arm64"
-    elif system == "windows":
-        return "windows-x64"
 
-    return None
+def get_settings() -> sublime.Settings:
+    """Get the package settings, loading them on first use."""
+    global _SETTINGS
+    if _SETTINGS is None:
+        _SETTINGS = sublime.load_settings(SETTINGS_NAME)
+    return _SETTINGS
 
 
 def get_storage_path() -> Path:
-    """Get the package storage path for downloaded binaries."""
-    cache_path = sublime.cache_path()
-    storage_path = Path(cache_path) / "Package Storage" / PACKAGE_NAME
-    storage_path.mkdir(parents=True, exist_ok=True)
-    return storage_path
+    """Get the package storage path for downloaded binaries.
+
+    The directory is created once, on first use, usually from plugin_loaded.
+    """
+    global _STORAGE_PATH
+    if _STORAGE_PATH is None:
+        storage_path = Path(sublime.cache_path()) / "Package Storage" / PACKAGE_NAME
+        storage_path.mkdir(parents=True, exist_ok=True)
+        _STORAGE_PATH = storage_path
+    return _STORAGE_PATH
 
 
 def find_binary_in_path() -> Optional[str]:
@@ -60,40 +131,240 @@ def find_binary_in_path() -> Optional[str]:
     return shutil.which(BINARY_NAME)
 
 
-def find_binary_in_common_paths() -> Optional[str]:
-    """Try to find the binary in common installation locations."""
+def _common_binary_paths() -> Tuple[str, ...]:
+    """List the usual install locations of the binary on this platform."""
     home = os.path.expanduser("~")
-    common_paths = [
-        os.path.join(home, ".cargo", "bin", BINARY_NAME),
-        "/opt/homebrew/bin/" + BINARY_NAME,
+    system = platform.system().lower()
+
+    if system == "windows":
+        exe_name = BINARY_NAME + ".exe"
+        local_app_data = os.environ.get("LOCALAPPDATA", os.path.join(home, "AppData", "Local"))
+        return (
+            os.path.join(home, ".cargo", "bin", exe_name),
+            os.path.join(local_app_data, "Programs", BINARY_NAME, exe_name),
+        )
+
+    cargo_path = os.path.join(home, ".cargo", "bin", BINARY_NAME)
+    if system == "darwin":
+        # Homebrew lives in /opt/homebrew on Apple Silicon, /usr/local on Intel
+        if platform.machine().lower() in ("arm64", "aarch64"):
+            return (
+                "/opt/homebrew/bin/" + BINARY_NAME,
+                cargo_path,
+                "/usr/local/bin/" + BINARY_NAME,
+            )
+        return (
+            cargo_path,
+            "/usr/local/bin/" + BINARY_NAME,
+        )
+
+    return (
+        cargo_path,
         "/usr/local/bin/" + BINARY_NAME,
         "/usr/bin/" + BINARY_NAME,
-    ]
+    )
+
+
+_COMMON_BINARY_PATHS = _common_binary_paths()
+
 
-    for path in common_paths:
-        if os.path.isfile(path) and os.access(path, os.X_OK):
+def find_binary_in_common_paths() -> Optional[str]:
+    """Try to find the binary in common installation locations."""
+    # One stat per candidate; the mode tells us both "regular file" and "executable"
+    for path in _COMMON_BINARY_PATHS:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode) and st.st_mode & (stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH):
             return path
 
     return None
 
 
-def get_latest_release_info() -> Optional[Dict[str, Any]]:
-    """Fetch latest release info from GitHub."""
-    url = f"https://api.github.com/repos/{GITHUB_REPO}/releases"
+def _new_connection(host: str, timeout: float) -> http.client.HTTPSConnection:
+    """Open a connection to host, tunnelling through the HTTPS proxy if one is set.
+
+    Proxies come from urllib.request.getproxies(), i.e. the https_proxy
+    environment variable or the macOS/Windows system settings, like urlopen.
+    """
+    proxy = urllib.request.getproxies().get("https")
+    if not proxy or urllib.request.proxy_bypass(host.rsplit(":", 1)[0]):
+        return http.client.HTTPSConnection(host, timeout=timeout)
+
+    if "://" not in proxy:
+        proxy = "http://" + proxy
+    parts = urllib.parse.urlsplit(proxy)
+
+    tunnel_headers = {}
+    if parts.username is not None:
+        username = urllib.parse.unquote(parts.username)
+        password = urllib.parse.unquote(parts.password or "")
+        credentials = f"{username}:{password}"
+        tunnel_headers["Proxy-Authorization"] = "Basic " + base64.b64encode(credentials.encode()).decode("ascii")
+
+    # TCP to the proxy, CONNECT to host, then TLS with host end to end
+    conn = http.client.HTTPSConnection(parts.hostname, parts.port, timeout=timeout)
+    conn.set_tunnel(host, headers=tunnel_headers)
+    return conn
+
+
+def _checkout_connection(host: str, timeout: float) -> Tuple[http.client.HTTPSConnection, bool]:
+    """Take the idle connection to host out of the pool, or open a new one.
+
+    Returns the connection and whether it was reused from the pool.
+    """
+    with _HTTP_LOCK:
+        conn = _HTTP_CONNECTIONS.pop(host, None)
+    if conn is None:
+        return _new_connection(host, timeout), False
+
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+    return conn, True
+
+
+def _checkin_connection(host: str, conn: http.client.HTTPSConnection) -> None:
+    """Return an idle connection to the pool, closing it if host already has one."""
+    with _HTTP_LOCK:
+        if host not in _HTTP_CONNECTIONS:
+            _HTTP_CONNECTIONS[host] = conn
+            return
+    conn.close()
+
+
+def _send_request(
+    host: str,
+    path: str,
+    headers: Dict[str, str],
+    timeout: float
+) -> Tuple[http.client.HTTPSConnection, http.client.HTTPResponse]:
+    """Send a GET to host, reconnecting if the pooled connection went stale."""
+    conn, reused = _checkout_connection(host, timeout)
+    try:
+        conn.request("GET", path, headers=headers)
+        return conn, conn.getresponse()
+    except Exception as e:
+        conn.close()
+        # Only a kept-alive connection the server dropped while idle is
+        # retried; a dropped TLS connection often shows up as ssl.SSLEOFError
+        if not (reused and isinstance(e, (http.client.HTTPException, ConnectionError, ssl.SSLError))):
+            raise
+
+    conn = _new_connection(host, timeout)
+    try:
+        conn.request("GET", path, headers=headers)
+        return conn, conn.getresponse()
+    except Exception:
+        conn.close()
+        raise
+
+
+@contextlib.contextmanager
+def _https_get(url: str, headers: Dict[str, str], timeout: float) -> Iterator[http.client.HTTPResponse]:
+    """GET a URL over a kept-alive connection to its host, following redirects.
+
+    Reusing connections across calls saves a TCP and TLS handshake for every
+    GitHub request after the first. The connection is checked out of the pool
+    while the `with` block runs and only returned to it if the response was
+    read to the end there.
+    """
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path + ("?" + parts.query if parts.query else "")
+        conn, response = _send_request(parts.netloc, path, headers, timeout)
+
+        location = response.getheader("Location")
+        if response.status in (301, 302, 303, 307, 308) and location:
+            response.read()
+            _checkin_connection(parts.netloc, conn)
+            url = urllib.parse.urljoin(url, location)
+            continue
+
+        try:
+            yield response
+        except BaseException:
+            conn.close()
+            raise
+        if response.isclosed():
+            _checkin_connection(parts.netloc, conn)
+        else:
+            # The caller stopped early; dropping the connection beats
+            # downloading the rest of the body just to reuse it
+            conn.close()
+        return
+
+    raise RuntimeError(f"Too many redirects fetching {url}")
+
+
+def _close_connections() -> None:
+    """Close all idle kept-alive HTTPS connections."""
+    with _HTTP_LOCK:
+        for conn in _HTTP_CONNECTIONS.values():
+            conn.close()
+        _HTTP_CONNECTIONS.clear()
+
+
+def _load_cached_json(cache_file: Path) -> Optional[Any]:
+    """Load a GitHub API response saved by _fetch_github_json."""
+    try:
+        return json.loads(cache_file.read_bytes())
+    except (OSError, ValueError):
+        return None
+
 
+def _update_rate_limit(headers: Any) -> None:
+    """Remember when the GitHub API quota runs out, from response headers."""
+    global _RATE_LIMIT_RESET
     try:
-        req = urllib.request.Request(url)
-        req.add_header("Accept", "application/vnd.github.v3+json")
-        req.add_header("User-Agent", f"LSP-fleet/{PACKAGE_NAME}")
+        remaining = int(headers.get("X-RateLimit-Remaining", ""))
+        reset = float(headers.get("X-RateLimit-Reset", ""))
+    except (TypeError, ValueError):
+        return
+    _RATE_LIMIT_RESET = reset if remaining <= RATE_LIMIT_RESERVE else 0.0
 
-        with urllib.request.urlopen(req, timeout=30) as response:
-            releases = json.loads(response.read().decode("utf-8"))
 
-            # Find first release with fleet-schema-gen assets
-            for release in releases:
-                for asset in release.get("assets", []):
-                    if asset["name"].startswith(BINARY_NAME):
-                        return release
+def _fetch_github_json(endpoint: str, cache_name: str) -> Optional[Any]:
+    """Fetch a GitHub API endpoint of GITHUB_REPO.
+
+    The response is cached on disk as `<cache_name>.json` along with its ETag
+    so unchanged data is revalidated with a conditional request, which GitHub
+    answers with a 304 that does not count against the rate limit.
+    """
+    url = f"https://api.github.com/repos/{GITHUB_REPO}/{endpoint}"
+    storage_path = get_storage_path()
+    etag_file = storage_path / f"{cache_name}.etag"
+    cache_file = storage_path / f"{cache_name}.json"
+
+    if time.time() < _RATE_LIMIT_RESET:
+        # Quota is (nearly) exhausted, don't spend the rest of it
+        return _load_cached_json(cache_file)
+
+    try:
+        headers = {
+            "Accept": "application/vnd.github+json",
+            "User-Agent": f"LSP-fleet/{PACKAGE_NAME}",
+        }
+        if etag_file.exists() and cache_file.exists():
+            headers["If-None-Match"] = etag_file.read_text().strip()
+
+        with _https_get(url, headers, timeout=30) as response:
+            _update_rate_limit(response.headers)
+            body = response.read()
+
+        if response.status == 304:
+            return _load_cached_json(cache_file)
+        if response.status != 200:
+            print(f"[{PACKAGE_NAME}] Failed to fetch release info: HTTP {response.status} {response.reason}")
+            return None
+
+        data = json.loads(body)
+        etag = response.getheader("ETag")
+        if etag:
+            cache_file.write_bytes(body)
+            etag_file.write_text(etag)
+        return data
 
     except Exception as e:
         print(f"[{PACKAGE_NAME}] Failed to fetch release info: {e}")
@@ -101,6 +372,70 @@ def get_latest_release_info() -> Optional[Dict[str, Any]]:
     return None
 
 
+def _has_binary_assets(release: Dict[str, Any]) -> bool:
+    """Check whether a release ships fleet-schema-gen archives."""
+    return any(asset["name"].startswith(BINARY_NAME) for asset in release.get("assets", []))
+
+
+def get_latest_release_info() -> Optional[Dict[str, Any]]:
+    """Fetch latest release info from GitHub.
+
+    Only the latest release is requested; the few most recent releases are
+    searched if it carries no fleet-schema-gen assets. The result is kept in
+    memory for RELEASE_INFO_TTL seconds.
+    """
+    global _RELEASE_INFO_CACHE
+    if _RELEASE_INFO_CACHE is not None:
+        fetched_at, release = _RELEASE_INFO_CACHE
+        if time.monotonic() - fetched_at < RELEASE_INFO_TTL:
+            return release
+
+    latest = _fetch_github_json("releases/latest", "release-latest")
+    if latest is not None and _has_binary_assets(latest):
+        _RELEASE_INFO_CACHE = (time.monotonic(), latest)
+        return latest
+
+    # Find first recent release with fleet-schema-gen assets
+    releases = _fetch_github_json("releases?per_page=5", "releases")
+    found = next((r for r in releases or [] if _has_binary_assets(r)), None)
+
+    if releases is not None:
+        _RELEASE_INFO_CACHE = (time.monotonic(), found)
+    return found
+
+
+def _only_binary(member: tarfile.TarInfo, dest_path: str) -> Optional[tarfile.TarInfo]:
+    """Extraction filter admitting only the regular binary file we renamed.
+
+    Cheaper than tarfile.data_filter, whose link and path checks cannot apply
+    to a single allow-listed regular file; special mode bits are still dropped.
+    """
+    if member.name != PART_NAME or not member.isreg():
+        return None
+    return member.replace(mode=member.mode & 0o755, deep=False)
+
+
+def _file_sha256(path: Path) -> str:
+    """Compute the SHA-256 hex digest of a file."""
+    with open(path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+def _read_installed_version(version_file: Path) -> Dict[str, str]:
+    """Read the version and checksum recorded for the downloaded binary."""
+    try:
+        installed = json.loads(version_file.read_text())
+    except (OSError, ValueError):
+        # Missing, or the plain version string written by older releases
+        return {}
+    return installed if isinstance(installed, dict) else {}
+
+
 def download_binary() -> Optional[str]:
     """Download the binary from GitHub releases."""
     platform_suffix = get_platform_suffix()
@@ -134,48 +469,70 @@ def download_binary() -> Optional[str]:
         print(f"[{PACKAGE_NAME}] No matching asset found: {asset_name}")
         return None
 
-    # Check if we already have this version
+    # Check if we already have an intact copy of this version
     version_file = storage_path / "version"
-    if binary_path.exists() and version_file.exists():
-        current_version = version_file.read_text().strip()
-        if current_version == version:
+    if binary_path.exists():
+        installed = _read_installed_version(version_file)
+        if installed.get("version") == version and installed.get("sha256") == _file_sha256(binary_path):
             return str(binary_path)
 
     print(f"[{PACKAGE_NAME}] Downloading {asset_name}...")
 
-    try:
-        archive_path = storage_path / asset_name
-
-        # Download archive
-        req = urllib.request.Request(asset_url)
-        req.add_header("User-Agent", f"LSP-fleet/{PACKAGE_NAME}")
-
-        with urllib.request.urlopen(req, timeout=120) as response:
-            with open(archive_path, "wb") as f:
-                f.write(response.read())
-
-        # Extract binary
-        with tarfile.open(archive_path, "r:gz") as tar:
-            for member in tar.getmembers():
-                if member.name == BINARY_NAME or member.name.endswith("/" + BINARY_NAME):
-                    member.name = BINARY_NAME
-                    tar.extract(member, storage_path)
-                    break
-
-        # Make executable
-        binary_path.chmod(binary_path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    # Extract next to the binary and swap it in once complete, so an
+    # interrupted download never leaves a truncated binary behind
+    part_path = storage_path / PART_NAME
 
-        # Clean up archive
-        archive_path.unlink()
+    try:
+        headers = {"User-Agent": f"LSP-fleet/{PACKAGE_NAME}"}
+
+        # Decompress with gzip.GzipFile and stream the plain tar from it, so
+        # download, decompression and extraction overlap. tarfile's own "r|gz"
+        # slices its decompression buffer quadratically (CPython gh-121109).
+        # Keep tarfile's default bufsize: it re-slices its read buffer on
+        # every read too, so a larger buffer only makes each copy bigger.
+        with _https_get(asset_url, headers, timeout=120) as response:
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status} {response.reason}")
+
+            with gzip.GzipFile(fileobj=response, mode="rb") as gz:
+                with tarfile.open(fileobj=gz, mode="r|") as tar:
+                    for member in tar:
+                        if not member.isreg():
+                            continue
+                        if member.name != BINARY_NAME and not member.name.endswith("/" + BINARY_NAME):
+                            continue
+                        member.name = PART_NAME
+                        mode = member.mode
+                        if hasattr(tarfile, "data_filter"):
+                            tar.extract(member, storage_path, filter=_only_binary)
+                        else:
+                            tar.extract(member, storage_path)
+                        break
+                    else:
+                        raise RuntimeError(f"{BINARY_NAME} not found in {asset_name}")
+
+        if not part_path.is_file():
+            raise RuntimeError(f"{BINARY_NAME} was not extracted from {asset_name}")
+
+        # Make executable, from the mode recorded in the archive
+        os.chmod(part_path, (mode | 0o111) & 0o755)
+
+        sha256 = _file_sha256(part_path)
+        os.replace(part_path, binary_path)
 
         # Save version
-        version_file.write_text(version)
+        version_file.write_text(json.dumps({"version": version, "sha256": sha256}))
 
         print(f"[{PACKAGE_NAME}] Successfully installed {BINARY_NAME} {version}")
         return str(binary_path)
 
     except Exception as e:
         print(f"[{PACKAGE_NAME}] Failed to download binary: {e}")
+        # Don't leave a partial extraction behind
+        try:
+            part_path.unlink()
+        except OSError:
+            pass
         # Fall back to existing binary
         if binary_path.exists():
             return str(binary_path)
@@ -183,10 +540,18 @@ def download_binary() -> Optional[str]:
 
 
 def get_binary_path() -> Optional[str]:
-    """Get the binary path, trying multiple methods."""
+    """Get the binary path, reusing the result of the last successful lookup."""
+    global _BINARY_PATH_CACHE
+    with _BINARY_PATH_LOCK:
+        if _BINARY_PATH_CACHE is None:
+            _BINARY_PATH_CACHE = find_binary_path()
+        return _BINARY_PATH_CACHE
+
+
+def find_binary_path() -> Optional[str]:
+    """Find the binary path, trying multiple methods."""
     # 1. Check user-configured path
-    settings = sublime.load_settings("LSP-fleet.sublime-settings")
-    custom_path = settings.get("binary_path")
+    custom_path = get_settings().get("binary_path")
     if custom_path and os.path.isfile(custom_path):
         return custom_path
 
@@ -200,14 +565,54 @@ def get_binary_path() -> Optional[str]:
     if path:
         return path
 
-    # 4. Download from GitHub
-    path = download_binary()
-    if path:
-        return path
+    # 4. Use a previously downloaded binary; downloads happen in
+    #    ensure_binary_async so this lookup never blocks on the network
+    binary_path = get_storage_path() / BINARY_NAME
+    if binary_path.is_file():
+        return str(binary_path)
 
     return None
 
 
+def install_binary() -> Optional[str]:
+    """Download or update the binary and make it the one get_binary_path returns."""
+    global _BINARY_PATH_CACHE
+    path = download_binary()
+    with _BINARY_PATH_LOCK:
+        _INSTALL_STATE["done"] = True
+        _INSTALL_STATE["path"] = path
+        if path:
+            _BINARY_PATH_CACHE = path
+    _SERVER_VERSION_CACHE.clear()
+    return path
+
+
+def ensure_binary_async() -> None:
+    """Download or update the binary on a background thread.
+
+    Only one download runs at a time, and a successful one is never repeated;
+    a failed one may be retried by calling this again.
+    """
+    def run() -> None:
+        path = install_binary()
+
+        def report() -> None:
+            if path:
+                print(f"[{PACKAGE_NAME}] Using binary: {path}")
+            else:
+                print(f"[{PACKAGE_NAME}] Binary not found - install will be attempted on first use")
+
+        sublime.set_timeout(report, 0)
+
+    with _BINARY_PATH_LOCK:
+        if _INSTALL_STATE["started"] and (not _INSTALL_STATE["done"] or _INSTALL_STATE["path"]):
+            return
+        _INSTALL_STATE.update(started=True, done=False, path=None)
+        thread = threading.Thread(target=run, name=f"{PACKAGE_NAME}-install", daemon=True)
+        _INSTALL_STATE["thread"] = thread
+        thread.start()
+
+
 class FleetLsp(AbstractPlugin):
     """Fleet GitOps LSP client for Sublime Text."""
 
@@ -223,18 +628,27 @@ class FleetLsp(AbstractPlugin):
     def server_version(cls) -> str:
         """Return server version string."""
         binary = get_binary_path()
-        if binary:
-            try:
-                result = subprocess.run(
-                    [binary, "--version"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                if result.returncode == 0:
-                    return result.stdout.strip().split()[-1]
-            except Exception:
-                pass
+        if not binary:
+            return "unknown"
+        if binary in _SERVER_VERSION_CACHE:
+            return _SERVER_VERSION_CACHE[binary]
+
+        # Don't allocate a console window for the probe on Windows
+        creationflags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        try:
+            result = subprocess.run(
+                [binary, "--version"],
+                capture_output=True,
+                text=True,
+                timeout=5,
+                creationflags=creationflags
+            )
+            if result.returncode == 0:
+                version = result.stdout.strip().split()[-1]
+                _SERVER_VERSION_CACHE[binary] = version
+                return version
+        except Exception:
+            pass
         return "unknown"
 
     @classmethod
@@ -245,14 +659,18 @@ class FleetLsp(AbstractPlugin):
     @classmethod
     def install_or_update(cls) -> None:
         """Install or update the server."""
-        path = download_binary()
+        # Go through ensure_binary_async so this never races the download
+        # started from plugin_loaded
+        ensure_binary_async()
+        _INSTALL_STATE["thread"].join()
+        path = _INSTALL_STATE["path"]
         if not path:
             raise RuntimeError("Failed to download fleet-schema-gen binary")
 
     @classmethod
     def configuration(cls) -> sublime.Settings:
         """Return plugin configuration."""
-        return sublime.load_settings("LSP-fleet.sublime-settings")
+        return get_settings()
 
     @classmethod
     def additional_variables(cls) -> Dict[str, str]:
@@ -271,21 +689,37 @@ class FleetLsp(AbstractPlugin):
         return False  # Let the default behavior proceed
 
 
+def _on_settings_changed() -> None:
+    """Forget the cached binary path so a new binary_path setting applies."""
+    global _BINARY_PATH_CACHE
+    with _BINARY_PATH_LOCK:
+        _BINARY_PATH_CACHE = None
+
+
 def plugin_loaded() -> None:
     """Called when the plugin is loaded."""
+    global _SETTINGS
     print(f"[{PACKAGE_NAME}] Plugin loaded")
 
-    # Trigger initial download in background
+    # Settings objects are live, so one instance serves the whole session
+    _SETTINGS = sublime.load_settings(SETTINGS_NAME)
+    _SETTINGS.add_on_change(PACKAGE_NAME, _on_settings_changed)
+
+    get_storage_path()
+
+    # Trigger initial download or update check in background
     def check_installation():
         path = get_binary_path()
-        if path:
+        if path and path != str(get_storage_path() / BINARY_NAME):
             print(f"[{PACKAGE_NAME}] Using binary: {path}")
         else:
-            print(f"[{PACKAGE_NAME}] Binary not found - install will be attempted on first use")
+            ensure_binary_async()
 
     sublime.set_timeout_async(check_installation, 1000)
 
 
 def plugin_unloaded() -> None:
     """Called when the plugin is unloaded."""
-    pass
+    if _SETTINGS is not None:
+        _SETTINGS.clear_on_change(PACKAGE_NAME)
+    _close_connections()